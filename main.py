@@ -1,5 +1,9 @@
+import argparse
 import os
 import re
+import sys
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
 import fitz  # PyMuPDF
 import pdfplumber
 from reportlab.lib.pagesizes import letter
@@ -8,6 +12,117 @@ from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.units import inch
 
+# PyMuPDF plain-text extraction flags: the library defaults for "text"
+# plus dehyphenation
+_TEXT_FLAGS = fitz.TEXTFLAGS_TEXT | fitz.TEXT_DEHYPHENATE
+
+# Documents with at least this many pages are extracted in worker processes,
+# provided more than one worker is available. Starting a spawned worker
+# (re-importing this module) costs about 0.5 s against roughly 0.3 ms per
+# page of serial extraction, so the pool only pays off on very long PDFs
+_PARALLEL_MIN_PAGES = 4000
+_WORKERS = min(8, os.cpu_count() or 1)
+
+# Pages extracted between flushes of MuPDF's resource cache
+_PAGE_CHUNK = 64
+
+# The sample style sheet is built once; the styles are only read from
+_STYLES = getSampleStyleSheet()
+_TITLE = _STYLES["Title"]
+_H1 = _STYLES["Heading1"]
+_H2 = _STYLES["Heading2"]
+_NORMAL = _STYLES["Normal"]
+
+# Spacer heights. ReportLab marks flowables it has to postpone to the next
+# frame, so a fresh Spacer is created for every use rather than shared
+_SP_SMALL = 0.05*inch
+_SP_MED = 0.15*inch
+_SP_LARGE = 0.25*inch
+
+# Pre-compiled patterns used by the questionnaire parsers
+# The question pattern only detects the number and separator; match.end()
+# is where the (already stripped) text begins
+_Q_RE = re.compile(r'^(\d+)[\.)\s]+(?=\S)')
+
+# Option markers; options are parsed by _parse_option without a regex
+_OPT_CHARS = frozenset("abcdABCD1234")
+
+# Section headers; each alternative is its own group so that
+# match.lastindex identifies the entry in _SECTIONS. A header of another
+# type also ends the section being parsed
+_SECTION_HDR = re.compile(
+    r'^(?:(Multiple\s+Choice)|(True\s+or\s+False)|(Short\s+Answer)|(Long\s+Answer))',
+    re.IGNORECASE
+)
+
+# Question types. Interned so every Question shares the same string objects;
+# dict lookups on them then succeed on the identity check alone
+_MCQ = sys.intern("mcq")
+_TF = sys.intern("true_false")
+_SA = sys.intern("short_answer")
+_LA = sys.intern("long_answer")
+
+# (display label, question type, collect options), in
+# the same order as the groups of _SECTION_HDR
+_SECTIONS = (
+    ("Multiple Choice", _MCQ, True),
+    ("True or False", _TF, False),
+    ("Short Answer", _SA, False),
+    ("Long Answer", _LA, False),
+)
+
+@dataclass(slots=True)
+class Option:
+    """
+    A single Multiple Choice option.
+    """
+    letter: str
+    text: str
+
+@dataclass(slots=True)
+class Question:
+    """
+    A parsed question; options are only filled in for Multiple Choice.
+    """
+    number: str
+    text: str
+    type: str
+    options: list = field(default_factory=list)
+
+def _page_texts(doc, start, stop):
+    """
+    Extract the plain text of pages [start, stop) of an open PyMuPDF document.
+    Pages are processed in chunks and MuPDF's object store is emptied after
+    each chunk so cached page resources don't accumulate on long documents.
+    """
+    pages_text = []
+    append = pages_text.append
+    for chunk_start in range(start, stop, _PAGE_CHUNK):
+        for i in range(chunk_start, min(chunk_start + _PAGE_CHUNK, stop)):
+            append(doc.load_page(i).get_text("text", flags=_TEXT_FLAGS, sort=False))
+        fitz.TOOLS.store_shrink(100)
+    return pages_text
+
+def _extract_page_range(pdf_path, start, stop):
+    """
+    Worker entry point: open the PDF in this process and extract a page range.
+    """
+    with fitz.open(pdf_path) as doc:
+        return _page_texts(doc, start, stop)
+
+def _extract_pages_parallel(pdf_path, page_count):
+    """
+    Split a large PDF into contiguous page ranges and extract them in worker
+    processes. PyMuPDF is not thread-safe, so each worker opens its own document.
+    """
+    step = -(-page_count // _WORKERS)
+    with ProcessPoolExecutor(max_workers=_WORKERS) as executor:
+        futures = [
+            executor.submit(_extract_page_range, pdf_path, start, min(start + step, page_count))
+            for start in range(0, page_count, step)
+        ]
+        return [page_text for future in futures for page_text in future.result()]
+
 def extract_text_from_pdf(pdf_path):
     """
     Extracts text from a PDF using multiple methods to ensure success.
@@ -17,7 +132,17 @@ def extract_text_from_pdf(pdf_path):
     # Method 1: Try PyMuPDF (digital PDFs)
     try:
         with fitz.open(pdf_path) as doc:
-            text = "\n".join(page.get_text() for page in doc).strip()
+            page_count = doc.page_count
+            pages_text = None
+            if _WORKERS > 1 and page_count >= _PARALLEL_MIN_PAGES:
+                try:
+                    pages_text = _extract_pages_parallel(pdf_path, page_count)
+                except Exception as e:
+                    # Worker start-up or crash; the serial path still works
+                    print(f"Parallel PyMuPDF extraction failed, retrying serially: {e}")
+            if pages_text is None:
+                pages_text = _page_texts(doc, 0, page_count)
+        text = "\n".join(pages_text).strip()
         if text and len(text) > 100:  # If substantial text was extracted
             print(f"Text successfully extracted using PyMuPDF from {pdf_path}")
             print(f"Text length: {len(text)} characters")
@@ -25,7 +150,7 @@ def extract_text_from_pdf(pdf_path):
     except Exception as e:
         print(f"PyMuPDF extraction failed: {e}")
     
-    # Method 2: Try pdfplumber (better for some digital PDFs)
+    # Method 2: Try pdfplumber (scanned or otherwise text-poor PDFs)
     try:
         with pdfplumber.open(pdf_path) as pdf:
             pages_text = [page.extract_text() or "" for page in pdf.pages]
@@ -38,19 +163,52 @@ def extract_text_from_pdf(pdf_path):
     
     return "Text extraction failed for this document."
 
-def parse_mcq_section(lines, start_index):
+def _parse_option(line):
+    """
+    Parse a stripped Multiple Choice option line such as "a) text" or "2. text".
+    Returns (letter, text) with the text normalized to "<letter>. <text>",
+    or None if the line is not an option.
+    """
+    if line[0] not in _OPT_CHARS:
+        return None
+    
+    # Skip the separator run of '.', ')' and whitespace
+    n = len(line)
+    j = 1
+    while j < n and (line[j] in ".)" or line[j].isspace()):
+        j += 1
+    if j == 1:
+        return None
+    if j == n:
+        # Only separator characters follow the marker; the last one is the text
+        if n < 3:
+            return None
+        j = n - 1
+    
+    letter = line[0]
+    if line[1:j] != ". ":
+        line = f"{letter}. {line[j:]}"
+    return letter, line
+
+def _parse_section(lines, start_index, qtype, collect_options):
     """
-    Parse a Multiple Choice Questions section, creating a structured 
-    representation of questions and their options.
+    Parse the questions of a single section, stopping at the next section
+    header. When collect_options is set, up to 4 options are read after
+    each question (Multiple Choice).
     """
     questions = []
+    append = questions.append
+    q_match = _Q_RE.match
+    parse_option = _parse_option
+    header_match = _SECTION_HDR.match
+    n = len(lines)
     i = start_index
     
-    # First line after "Multiple Choice Questions:" should be skipped if empty
-    if i < len(lines) and not lines[i].strip():
+    # First line after the section header should be skipped if empty
+    if i < n and not lines[i].strip():
         i += 1
     
-    while i < len(lines):
+    while i < n:
         line = lines[i].strip()
         
         # Skip empty lines
@@ -58,30 +216,41 @@ def parse_mcq_section(lines, start_index):
             i += 1
             continue
         
-        # Check if we've reached a different section
-        if re.match(r'^(True\s+or\s+False|Short\s+Answer|Long\s+Answer)', line, re.IGNORECASE):
+        # Most lines start with a digit, so only run the regexes when the
+        # first character can possibly match
+        first = line[0]
+        
+        # Check if we've reached a different section; a repeated header of
+        # the current type is skipped like any other non-question line
+        section_match = header_match(line) if first.isalpha() else None
+        if section_match and _SECTIONS[section_match.lastindex - 1][1] is not qtype:
             break
         
         # Check if this is a question (starts with a number)
-        question_match = re.match(r'^(\d+)[\.)\s]+(.+)', line)
-        if question_match:
-            q_num = question_match.group(1)
-            q_text = question_match.group(2).strip()
-            
-            # Create a new question entry
-            question = {
-                "number": q_num,
-                "text": f"{q_num}. {q_text}",
-                "type": "mcq",
-                "options": []
-            }
-            
-            # Move to the next line to look for options
+        question_match = q_match(line) if first.isdigit() else None
+        if not question_match:
+            # If the line doesn't match a question pattern, skip it
             i += 1
-            
+            continue
+        
+        q_num = question_match.group(1)
+        
+        # Keep the line as-is when it already reads "<num>. <text>"
+        text_start = question_match.end()
+        if line[len(q_num):text_start] != ". ":
+            line = f"{q_num}. {line[text_start:]}"
+        
+        # Create a new question entry
+        question = Question(q_num, line, qtype)
+        
+        # Move to the next line to look for options
+        i += 1
+        
+        if collect_options:
             # Look for 4 options
+            options = question.options
             option_count = 0
-            while i < len(lines) and option_count < 4:
+            while i < n and option_count < 4:
                 option_line = lines[i].strip()
                 
                 # Skip empty lines
@@ -90,157 +259,17 @@ def parse_mcq_section(lines, start_index):
                     continue
                 
                 # Check if this is an option (starts with a number or letter)
-                option_match = re.match(r'^([a-d1-4])[\.)\s]+(.+)', option_line, re.IGNORECASE)
-                if option_match:
-                    opt_num = option_match.group(1)
-                    opt_text = option_match.group(2).strip()
-                    
-                    # Add the option to the current question
-                    question["options"].append({
-                        "letter": opt_num,
-                        "text": f"{opt_num}. {opt_text}"
-                    })
-                    
-                    option_count += 1
-                    i += 1
-                else:
+                option = parse_option(option_line)
+                if option is None:
                     # If this line doesn't match an option pattern, it might be the next question
                     break
-            
-            # Add the question to our list
-            questions.append(question)
-        else:
-            # If the line doesn't match a question pattern, skip it
-            i += 1
-    
-    return questions, i
-
-def parse_true_false_section(lines, start_index):
-    """
-    Parse a True/False section.
-    """
-    questions = []
-    i = start_index
-    
-    # First line after "True or False:" should be skipped if empty
-    if i < len(lines) and not lines[i].strip():
-        i += 1
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
-        
-        # Check if we've reached a different section
-        if re.match(r'^(Multiple\s+Choice|Short\s+Answer|Long\s+Answer)', line, re.IGNORECASE):
-            break
-        
-        # Check if this is a true/false question
-        question_match = re.match(r'^(\d+)[\.)\s]+(.+)', line)
-        if question_match:
-            q_num = question_match.group(1)
-            q_text = question_match.group(2).strip()
-            
-            # Create a new question entry
-            question = {
-                "number": q_num,
-                "text": f"{q_num}. {q_text}",
-                "type": "true_false",
-                "options": []  # No options for true/false questions
-            }
-            
-            questions.append(question)
-        
-        i += 1
-    
-    return questions, i
-
-def parse_short_answer_section(lines, start_index):
-    """
-    Parse a Short Answer section.
-    """
-    questions = []
-    i = start_index
-    
-    # First line after "Short Answer Questions:" should be skipped if empty
-    if i < len(lines) and not lines[i].strip():
-        i += 1
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
-        
-        # Check if we've reached a different section
-        if re.match(r'^(Multiple\s+Choice|True\s+or\s+False|Long\s+Answer)', line, re.IGNORECASE):
-            break
-        
-        # Check if this is a question
-        question_match = re.match(r'^(\d+)[\.)\s]+(.+)', line)
-        if question_match:
-            q_num = question_match.group(1)
-            q_text = question_match.group(2).strip()
-            
-            # Create a new question entry
-            question = {
-                "number": q_num,
-                "text": f"{q_num}. {q_text}",
-                "type": "short_answer",
-                "options": []  # No options for short answer questions
-            }
-            
-            questions.append(question)
-        
-        i += 1
-    
-    return questions, i
-
-def parse_long_answer_section(lines, start_index):
-    """
-    Parse a Long Answer section.
-    """
-    questions = []
-    i = start_index
-    
-    # First line after "Long Answer Questions:" should be skipped if empty
-    if i < len(lines) and not lines[i].strip():
-        i += 1
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        
-        # Skip empty lines
-        if not line:
-            i += 1
-            continue
-        
-        # Check if we've reached a different section
-        if re.match(r'^(Multiple\s+Choice|True\s+or\s+False|Short\s+Answer)', line, re.IGNORECASE):
-            break
-        
-        # Check if this is a question
-        question_match = re.match(r'^(\d+)[\.)\s]+(.+)', line)
-        if question_match:
-            q_num = question_match.group(1)
-            q_text = question_match.group(2).strip()
-            
-            # Create a new question entry
-            question = {
-                "number": q_num,
-                "text": f"{q_num}. {q_text}",
-                "type": "long_answer",
-                "options": []  # No options for long answer questions
-            }
-            
-            questions.append(question)
+                
+                options.append(Option(*option))
+                
+                option_count += 1
+                i += 1
         
-        i += 1
+        append(question)
     
     return questions, i
 
@@ -248,11 +277,10 @@ def parse_questionnaire(text):
     """
     Parse the questionnaire by sections, handling each type of question appropriately.
     """
-    # Clean up the text
-    text = re.sub(r'\n+', '\n', text)  # Normalize line breaks
-    
-    # Split into lines and clean them
-    lines = [line.strip() for line in text.split('\n')]
+    # Split on newlines only (not str.splitlines, which also breaks on form
+    # feeds and Unicode separators); lines are stripped, which drops any
+    # trailing \r, and blank ones skipped as they are read
+    lines = text.split('\n')
     
     all_questions = []
     i = 0
@@ -266,28 +294,12 @@ def parse_questionnaire(text):
             continue
         
         # Check for section headers
-        if re.match(r'^Multiple\s+Choice', line, re.IGNORECASE):
-            print(f"Found section: Multiple Choice")
-            mcq_questions, i = parse_mcq_section(lines, i + 1)
-            all_questions.extend(mcq_questions)
-            continue
-            
-        elif re.match(r'^True\s+or\s+False', line, re.IGNORECASE):
-            print(f"Found section: True or False")
-            tf_questions, i = parse_true_false_section(lines, i + 1)
-            all_questions.extend(tf_questions)
-            continue
-            
-        elif re.match(r'^Short\s+Answer', line, re.IGNORECASE):
-            print(f"Found section: Short Answer")
-            sa_questions, i = parse_short_answer_section(lines, i + 1)
-            all_questions.extend(sa_questions)
-            continue
-            
-        elif re.match(r'^Long\s+Answer', line, re.IGNORECASE):
-            print(f"Found section: Long Answer")
-            la_questions, i = parse_long_answer_section(lines, i + 1)
-            all_questions.extend(la_questions)
+        header_match = _SECTION_HDR.match(line) if line[0].isalpha() else None
+        if header_match:
+            label, qtype, collect_options = _SECTIONS[header_match.lastindex - 1]
+            print(f"Found section: {label}")
+            section_questions, i = _parse_section(lines, i + 1, qtype, collect_options)
+            all_questions.extend(section_questions)
             continue
         
         # If none of the above, move to the next line
@@ -296,9 +308,19 @@ def parse_questionnaire(text):
     print(f"Extracted {len(all_questions)} questions in total")
     return all_questions
 
-def create_structured_pdf(questions, output_path):
+def group_questions_by_type(questions):
+    """
+    Bucket questions by type in a single pass.
+    """
+    buckets = {_MCQ: [], _TF: [], _SA: [], _LA: []}
+    for q in questions:
+        buckets[q.type].append(q)
+    return buckets
+
+def create_structured_pdf(buckets, output_path):
     """
-    Create a well-structured PDF with questions correctly grouped by type.
+    Create a well-structured PDF from questions grouped by type
+    (see group_questions_by_type).
     """
     doc = SimpleDocTemplate(
         output_path,
@@ -309,70 +331,46 @@ def create_structured_pdf(questions, output_path):
         bottomMargin=72
     )
     
-    styles = getSampleStyleSheet()
-    title_style = styles["Title"]
-    heading_style = styles["Heading1"]
-    subheading_style = styles["Heading2"]
-    normal_style = styles["Normal"]
-    
     # Build the PDF content
-    content = []
-    content.append(Paragraph("Questionnaire", title_style))
-    content.append(Spacer(1, 0.25*inch))
-    
-    # Group questions by type
-    mcq_questions = [q for q in questions if q["type"] == "mcq"]
-    tf_questions = [q for q in questions if q["type"] == "true_false"]
-    sa_questions = [q for q in questions if q["type"] == "short_answer"]
-    la_questions = [q for q in questions if q["type"] == "long_answer"]
+    content = [Paragraph("Questionnaire", _TITLE), Spacer(1, _SP_LARGE)]
+    extend = content.extend
     
     # Add MCQ questions
+    mcq_questions = buckets[_MCQ]
     if mcq_questions:
-        content.append(Paragraph("Multiple Choice Questions:", heading_style))
-        content.append(Spacer(1, 0.15*inch))
+        extend((Paragraph("Multiple Choice Questions:", _H1), Spacer(1, _SP_MED)))
         
         for question in mcq_questions:
-            content.append(Paragraph(question["text"], subheading_style))
-            content.append(Spacer(1, 0.05*inch))
+            extend((Paragraph(question.text, _H2), Spacer(1, _SP_SMALL)))
             
             # Add options
-            for option in question["options"]:
-                content.append(Paragraph(option["text"], normal_style))
+            extend([Paragraph(option.text, _NORMAL) for option in question.options])
             
-            content.append(Spacer(1, 0.15*inch))
-    
-    # Add True/False questions
-    if tf_questions:
-        content.append(Paragraph("True or False:", heading_style))
-        content.append(Spacer(1, 0.15*inch))
-        
-        for question in tf_questions:
-            content.append(Paragraph(question["text"], subheading_style))
-            content.append(Spacer(1, 0.15*inch))
-    
-    # Add Short Answer questions
-    if sa_questions:
-        content.append(Paragraph("Short Answer Questions:", heading_style))
-        content.append(Spacer(1, 0.15*inch))
+            content.append(Spacer(1, _SP_MED))
+    
+    # Add True/False, Short Answer and Long Answer questions
+    for section_title, section_questions in (
+        ("True or False:", buckets[_TF]),
+        ("Short Answer Questions:", buckets[_SA]),
+        ("Long Answer Questions:", buckets[_LA]),
+    ):
+        if not section_questions:
+            continue
         
-        for question in sa_questions:
-            content.append(Paragraph(question["text"], subheading_style))
-            content.append(Spacer(1, 0.15*inch))
-    
-    # Add Long Answer questions
-    if la_questions:
-        content.append(Paragraph("Long Answer Questions:", heading_style))
-        content.append(Spacer(1, 0.15*inch))
+        extend((Paragraph(section_title, _H1), Spacer(1, _SP_MED)))
         
-        for question in la_questions:
-            content.append(Paragraph(question["text"], subheading_style))
-            content.append(Spacer(1, 0.15*inch))
+        for question in section_questions:
+            extend((Paragraph(question.text, _H2), Spacer(1, _SP_MED)))
     
     # Build and save the PDF
     doc.build(content)
     print(f"Structured questionnaire saved to {output_path}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Structure a questionnaire PDF by question type.")
+    parser.add_argument("--verbose", action="store_true", help="print the parsed questions")
+    args = parser.parse_args()
+    
     # File paths
     project_dir = r"D:\Shraddha_Project"
     questionnaire_pdf = os.path.join(project_dir, "DL_QNS1.pdf")  # Replace with your questionnaire
@@ -384,39 +382,35 @@ def main():
     # Parse the questionnaire into structured questions
     questions = parse_questionnaire(pdf_text)
     
-    # Display the parsed questions for verification
-    print("\nParsed Questions:")
-    
-    # Group questions by type for clearer display
-    question_types = {"mcq": [], "true_false": [], "short_answer": [], "long_answer": []}
-    for q in questions:
-        question_types[q["type"]].append(q)
-    
-    # Display MCQ questions
-    print("\nMultiple Choice Questions:")
-    for i, q in enumerate(question_types["mcq"], 1):
-        print(f"Question {i}: {q['text']}")
-        print("  Options:")
-        for opt in q["options"]:
-            print(f"    - {opt['text']}")
-    
-    # Display True/False questions
-    print("\nTrue or False Questions:")
-    for i, q in enumerate(question_types["true_false"], 1):
-        print(f"Question {i}: {q['text']}")
-    
-    # Display Short Answer questions
-    print("\nShort Answer Questions:")
-    for i, q in enumerate(question_types["short_answer"], 1):
-        print(f"Question {i}: {q['text']}")
+    # Group questions by type, shared by the display below and the PDF
+    buckets = group_questions_by_type(questions)
     
-    # Display Long Answer questions
-    print("\nLong Answer Questions:")
-    for i, q in enumerate(question_types["long_answer"], 1):
-        print(f"Question {i}: {q['text']}")
+    # Display the parsed questions for verification
+    if args.verbose:
+        out = ["\nParsed Questions:\n"]
+        append = out.append
+        
+        # Display MCQ questions
+        append("\nMultiple Choice Questions:\n")
+        for i, q in enumerate(buckets[_MCQ], 1):
+            append(f"Question {i}: {q.text}\n  Options:\n")
+            for opt in q.options:
+                append(f"    - {opt.text}\n")
+        
+        # Display True/False, Short Answer and Long Answer questions
+        for title, qtype in (
+            ("True or False Questions:", _TF),
+            ("Short Answer Questions:", _SA),
+            ("Long Answer Questions:", _LA),
+        ):
+            append(f"\n{title}\n")
+            for i, q in enumerate(buckets[qtype], 1):
+                append(f"Question {i}: {q.text}\n")
+        
+        sys.stdout.write("".join(out))
     
     # Create the structured PDF
-    create_structured_pdf(questions, output_pdf)
+    create_structured_pdf(buckets, output_pdf)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file